@@ -0,0 +1,3 @@
+from candy_detect.cli import main
+
+__all__ = ["main"]
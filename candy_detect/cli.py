@@ -0,0 +1,177 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from candy_detect.validate import SourceError, parse_resolution, resolve_source
+from config import load_config
+from profiling import StartupProfile
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--model",
+        help='Path to YOLO model file (example: "runs/detect/train/weights/best.pt"), defaults to model_path in config.json',
+        default=None,
+    )
+    parser.add_argument(
+        "--source",
+        help='Image source, can be image file ("test.jpg"), image folder ("test_dir"), video file ("testvid.mp4"), index of USB camera ("usb0"), or index of Picamera ("picamera0")',
+        required=True,
+    )
+    parser.add_argument(
+        "--thresh",
+        help='Minimum confidence threshold for displaying detected objects (example: "0.4"), defaults to min_thresh and class_thresh in config.json',
+        type=float,
+        default=None,
+    )
+    parser.add_argument(
+        "--max-det",
+        help='Maximum detections kept per frame (example: "50"), defaults to max_det in config.json',
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--resolution",
+        help='Resolution in WxH to display inference results at (example: "640x480"), otherwise, match source resolution',
+        default=None,
+    )
+    parser.add_argument(
+        "--record",
+        help='Record results from video or webcam and save it as "demo1.avi". Must specify --resolution argument to record.',
+        action="store_true",
+    )
+    parser.add_argument(
+        "--motion-gate",
+        help="Skip inference and reuse the last result while the scene is static (video and camera sources only).",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--motion-thresh",
+        help='Per-pixel grayscale difference (0-255) that counts as change for --motion-gate (example: "25")',
+        type=int,
+        default=25,
+    )
+    parser.add_argument(
+        "--motion-area",
+        help='Fraction of changed pixels that wakes the model for --motion-gate (example: "0.01")',
+        type=float,
+        default=0.01,
+    )
+    parser.add_argument(
+        "--motion-max-skip",
+        help='Force an inference after this many skipped frames, 0 to disable (example: "150")',
+        type=int,
+        default=150,
+    )
+    parser.add_argument(
+        "--startup-profile",
+        help="Print a timeline of startup phases once the first detection is shown.",
+        action="store_true",
+    )
+    return parser
+
+
+def main(argv: list | None = None):
+    profile = StartupProfile()
+    args = build_parser().parse_args(argv)
+
+    with profile.phase("load config"):
+        config = load_config()
+    model_path = args.model or config["model_path"]
+
+    if not os.path.exists(model_path):
+        print(
+            "ERROR: Model path is invalid or model was not found. Make sure the model filename was entered correctly."
+        )
+        sys.exit(0)
+
+    # Arguments are validated before anything heavy is imported, so a typo
+    # fails immediately instead of after the model has loaded.
+    try:
+        source_type, source_arg = resolve_source(args.source)
+        resolution = parse_resolution(args.resolution)
+    except SourceError as e:
+        print(e)
+        sys.exit(0)
+
+    if args.record:
+        if source_type not in ["video", "usb"]:
+            print(
+                "Recording only works for video and camera sources. Please try again."
+            )
+            sys.exit(0)
+        if not resolution:
+            print("Please specify resolution to record video at.")
+            sys.exit(0)
+
+    with profile.phase("import opencv"):
+        from candy_detect.pipeline import Detector, run
+        from candy_detect.sources import FrameSource
+
+    source = None
+    recorder = None
+    try:
+        # The model loads on a worker thread while the camera or files are opened.
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="model") as pool:
+            loading = pool.submit(
+                Detector.load, model_path, config, args.thresh, args.max_det, profile
+            )
+
+            with profile.phase("open source"):
+                source = FrameSource(source_type, source_arg, resolution)
+                source.open()
+
+            if args.record:
+                import cv2
+
+                recorder = cv2.VideoWriter(
+                    "demo1.avi",
+                    cv2.VideoWriter_fourcc(*"MJPG"),  # type:ignore
+                    30,
+                    resolution,  # type:ignore
+                )
+
+            with profile.phase("wait for model"):
+                detector = loading.result()
+
+        print("Detected YOLO classes:", detector.labels)
+
+        motion_gate = None
+        if args.motion_gate:
+            if not source.is_stream:
+                print(
+                    "Motion gating only works for video and camera sources. Ignoring."
+                )
+            else:
+                from motion_gate import MotionGate
+
+                motion_gate = MotionGate(
+                    pixel_thresh=args.motion_thresh,
+                    area_thresh=args.motion_area,
+                    max_skip=args.motion_max_skip,
+                )
+
+        avg_frame_rate = run(
+            detector,
+            source,
+            resolution=resolution,
+            recorder=recorder,
+            motion_gate=motion_gate,
+            profile=profile if args.startup_profile else None,
+        )
+    finally:
+        # Also runs when the model fails to load, so the camera is not left open.
+        if source is not None:
+            source.release()
+        if recorder is not None:
+            recorder.release()
+
+        import cv2
+
+        cv2.destroyAllWindows()
+
+    print(f"Average pipeline FPS: {avg_frame_rate:.2f}")
+    if motion_gate is not None:
+        print(motion_gate.summary())
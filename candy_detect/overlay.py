@@ -0,0 +1,189 @@
+import cv2
+
+from config import classify_calories
+
+COLORS = {
+    "green": (0, 255, 0),
+    "blue": (255, 0, 0),
+    "yellow": (0, 255, 255),
+    "orange": (0, 165, 255),
+    "red": (0, 0, 255),
+}
+
+RISK_COLORS = {
+    "Safe": COLORS["green"],
+    "Moderate": COLORS["blue"],
+    "High": COLORS["yellow"],
+    "Excessive": COLORS["orange"],
+    "Extreme": COLORS["red"],
+}
+
+BBOX_COLORS = [
+    (164, 120, 87),
+    (68, 148, 228),
+    (93, 97, 209),
+    (178, 182, 133),
+    (88, 159, 106),
+    (96, 202, 231),
+    (159, 124, 168),
+    (169, 162, 241),
+    (98, 118, 150),
+    (172, 176, 184),
+]
+
+
+def classify_sweets_calories(total_calories: float) -> tuple:
+    label = classify_calories(total_calories)
+    return (label, RISK_COLORS[label])
+
+
+def display_risk_level(
+    frame,
+    risk_level: tuple,
+    position: tuple = (20, 300),
+    font: int = cv2.FONT_HERSHEY_SIMPLEX,
+    font_scale: float = 1,
+    thickness: int = 2,
+):
+    label, color = risk_level
+    text = f"Risk Level: {label}"
+
+    cv2.putText(
+        frame,
+        text,
+        position,
+        font,
+        font_scale,
+        (0, 0, 0),
+        thickness + 3,
+        lineType=cv2.LINE_AA,
+    )
+
+    cv2.putText(
+        frame, text, position, font, font_scale, color, thickness, lineType=cv2.LINE_AA
+    )
+
+    return frame
+
+
+def draw_detection(frame, classidx: int, classname: str, conf: float, xyxy):
+    xmin, ymin, xmax, ymax = xyxy
+    color = BBOX_COLORS[classidx % 10]
+    cv2.rectangle(frame, (xmin, ymin), (xmax, ymax), color, 2)
+    label = f"{classname}: {int(conf * 100)}%"
+    labelSize, baseLine = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+    label_ymin = max(ymin, labelSize[1] + 10)
+    cv2.rectangle(
+        frame,
+        (xmin, label_ymin - labelSize[1] - 10),
+        (xmin + labelSize[0], label_ymin + baseLine - 10),
+        color,
+        cv2.FILLED,
+    )
+    cv2.putText(
+        frame,
+        label,
+        (xmin, label_ymin - 7),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.5,
+        (0, 0, 0),
+        1,
+    )
+
+
+def draw_info(
+    frame,
+    candy_counts: dict,
+    total_calories,
+    total_sugar,
+    fps: float | None = None,
+):
+    risk_level = classify_sweets_calories(total_calories)
+
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    font_scale = 0.5
+    thickness = 1
+    padding = 20
+
+    texts_to_measure = [
+        f"Number of candies: {sum(candy_counts.values())}",
+        f"Total calories: {total_calories}",
+        f"Total sugar (g): {total_sugar}",
+        f"Risk Level: {risk_level[0]}",
+    ]
+    if fps is not None:
+        texts_to_measure.append(f"FPS: {fps:0.2f}")
+
+    for candy, count in candy_counts.items():
+        texts_to_measure.append(f"{candy}: {count}")
+
+    max_text_width = 0
+    for text in texts_to_measure:
+        if text.startswith("Risk"):
+            (w, h), _ = cv2.getTextSize(text, font, font_scale * 2, thickness * 2)
+        else:
+            (w, h), _ = cv2.getTextSize(text, font, font_scale, thickness)
+        max_text_width = max(max_text_width, w)
+
+    if len(candy_counts) > 0:
+        final_y_pos = 200 + ((len(candy_counts) - 1) * 32) + 15
+    else:
+        final_y_pos = 130
+
+    box_x2 = 10 + max_text_width + padding
+    box_y2 = final_y_pos + padding
+
+    cv2.rectangle(frame, (10, 10), (box_x2, box_y2), (50, 50, 50), cv2.FILLED)
+
+    cv2.putText(
+        frame,
+        f"Number of candies: {sum(candy_counts.values())}",
+        (20, 40),
+        font,
+        font_scale,
+        (255, 102, 51),
+        thickness,
+    )
+    cv2.putText(
+        frame,
+        f"Total calories: {total_calories}",
+        (20, 75),
+        font,
+        font_scale,
+        (51, 204, 51),
+        thickness,
+    )
+    cv2.putText(
+        frame,
+        f"Total sugar (g): {total_sugar}",
+        (20, 110),
+        font,
+        font_scale,
+        (0, 204, 255),
+        thickness,
+    )
+
+    y_start = 150
+    for idx, (candy, count) in enumerate(candy_counts.items()):
+        cv2.putText(
+            frame,
+            f"{candy}: {count}",
+            (20, y_start + idx * 32),
+            font,
+            font_scale,
+            (255, 255, 255),
+            thickness,
+        )
+
+    display_risk_level(frame, risk_level)
+
+    if fps is not None:
+        cv2.putText(
+            frame,
+            f"FPS: {fps:0.2f}",
+            (10, 20),
+            font,
+            font_scale,
+            (0, 255, 255),
+            thickness,
+        )
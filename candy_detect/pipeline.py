@@ -0,0 +1,152 @@
+import time
+from contextlib import nullcontext
+
+import cv2
+import numpy as np
+
+from candy_detect.overlay import draw_detection, draw_info
+from config import NutritionTable, compile_thresholds, inference_kwargs
+
+
+class Detector:
+    def __init__(
+        self,
+        model,
+        config: dict,
+        thresh: float | None = None,
+        max_det: int | None = None,
+    ):
+        self.model = model
+        self.labels = model.names
+        # An explicit threshold applies to every class; otherwise use config.json.
+        min_thresh = config["min_thresh"] if thresh is None else float(thresh)
+        class_thresh = config["class_thresh"] if thresh is None else {}
+        max_det = config["max_det"] if max_det is None else int(max_det)
+
+        self.nutrition = NutritionTable(config["nutrition"], self.labels)
+        self.thresholds = compile_thresholds(class_thresh, self.labels, min_thresh)
+        self.imgsz = config["imgsz"]
+        self.predict_kwargs = inference_kwargs(self.thresholds, max_det, self.imgsz)
+
+    @classmethod
+    def load(
+        cls,
+        model_path: str,
+        config: dict,
+        thresh: float | None = None,
+        max_det: int | None = None,
+        profile=None,
+    ):
+        def phase(name):
+            return profile.phase(name) if profile is not None else nullcontext()
+
+        # ultralytics pulls in torch, which dominates startup on small boards.
+        with phase("import ultralytics"):
+            from ultralytics import YOLO  # type:ignore
+        with phase("load model"):
+            model = YOLO(model_path, task="detect")
+        detector = cls(model, config, thresh, max_det)
+        with phase("warm up model"):
+            imgsz = detector.imgsz
+            detector.predict(np.zeros((imgsz, imgsz, 3), dtype=np.uint8))
+        return detector
+
+    def predict(self, frame):
+        return self.model(frame, verbose=False, **self.predict_kwargs)
+
+    def detections(self, results) -> list:
+        boxes = results[0].boxes
+        class_ids = boxes.cls.cpu().numpy().astype(int)
+        confidences = boxes.conf.cpu().numpy()
+        xyxy = boxes.xyxy.cpu().numpy().astype(int)
+        keep = confidences > self.thresholds[class_ids]
+        return list(zip(class_ids[keep], confidences[keep], xyxy[keep]))
+
+    def summarize(self, class_ids) -> tuple:
+        class_counts = self.nutrition.counts(class_ids)
+        total_calories, total_sugar = self.nutrition.totals(class_counts)
+        return self.nutrition.counts_by_name(class_counts), total_calories, total_sugar
+
+
+def run(
+    detector: Detector,
+    source,
+    resolution: tuple | None = None,
+    recorder=None,
+    motion_gate=None,
+    profile=None,
+) -> float:
+    avg_frame_rate = 0
+    frame_rate_buffer = []
+    fps_avg_len = 200
+    show_info = True
+    results = None
+
+    while True:
+        t_start = time.perf_counter()
+
+        frame = source.read()
+        if frame is None:
+            break
+
+        if resolution:
+            frame = cv2.resize(frame, resolution)
+
+        # The gate sees every frame, including the first, so its reference and
+        # frame counts stay in step with the stream.
+        if motion_gate is None or motion_gate.should_infer(frame) or results is None:
+            t_infer = time.perf_counter()
+            results = detector.predict(frame)
+            if motion_gate is not None:
+                motion_gate.record_inference(time.perf_counter() - t_infer)
+
+        candies_detected = []
+        for classidx, conf, xyxy in detector.detections(results):
+            draw_detection(frame, classidx, detector.labels[classidx], conf, xyxy)
+            candies_detected.append(classidx)
+
+        candy_counts, total_calories, total_sugar = detector.summarize(
+            candies_detected
+        )
+
+        if show_info:
+            fps = avg_frame_rate if source.is_stream else None
+            draw_info(frame, candy_counts, total_calories, total_sugar, fps)
+
+        cv2.imshow("YOLO Candy Calorie Counter", frame)
+        if recorder is not None:
+            recorder.write(frame)
+
+        if profile is not None:
+            profile.mark("first detection shown")
+            print(profile.report())
+            profile = None
+
+        t_stop = time.perf_counter()
+        frame_rate_calc = (
+            float(1 / (t_stop - t_start)) if (t_stop - t_start) > 0 else 0.0
+        )
+
+        if len(frame_rate_buffer) >= fps_avg_len:
+            frame_rate_buffer.pop(0)
+        frame_rate_buffer.append(frame_rate_calc)
+        avg_frame_rate = np.mean(frame_rate_buffer)
+
+        if source.is_stream:
+            key = cv2.waitKey(5)
+        else:
+            key = cv2.waitKey(0)
+
+        if key == ord("q") or key == ord("Q"):
+            break
+        elif key == ord("s") or key == ord("S"):
+            source.step_back(2)
+            cv2.waitKey(1)
+        elif key == ord("p") or key == ord("P"):
+            cv2.imwrite("capture.png", frame)
+            source.step_back(1)
+        elif key == ord("t") or key == ord("T"):
+            show_info = not show_info
+            source.step_back(1)
+
+    return float(avg_frame_rate)
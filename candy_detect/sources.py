@@ -0,0 +1,83 @@
+import glob
+import os
+
+import cv2
+
+from candy_detect.validate import IMG_EXT_LIST, STREAM_TYPES
+
+
+class FrameSource:
+    def __init__(self, source_type: str, arg, resolution: tuple | None = None):
+        self.source_type = source_type
+        self.arg = arg
+        self.resolution = resolution
+        self.cap = None
+        self.images = []
+        self.index = 0
+
+    @property
+    def is_stream(self) -> bool:
+        return self.source_type in STREAM_TYPES
+
+    def open(self):
+        if self.source_type == "image":
+            self.images = [self.arg]
+        elif self.source_type == "folder":
+            self.images = [
+                file
+                for file in glob.glob(self.arg + "/*")
+                if os.path.splitext(file)[1] in IMG_EXT_LIST
+            ]
+        elif self.source_type in ["video", "usb"]:
+            self.cap = cv2.VideoCapture(self.arg)
+            if self.resolution:
+                self.cap.set(3, self.resolution[0])
+                self.cap.set(4, self.resolution[1])
+        elif self.source_type == "picamera":
+            from picamera2 import Picamera2  # type:ignore
+
+            size = self.resolution or (640, 480)
+            self.cap = Picamera2()
+            self.cap.configure(
+                self.cap.create_video_configuration(
+                    main={"format": "RGB888", "size": size}
+                )
+            )
+            self.cap.start()
+
+    def read(self):
+        if self.source_type in ["image", "folder"]:
+            if self.index >= len(self.images):
+                print("All images have been processed. Exiting program.")
+                return None
+            frame = cv2.imread(self.images[self.index])
+            self.index += 1
+            return frame
+        if self.source_type == "video":
+            ret, frame = self.cap.read()  # type:ignore
+            if not ret:
+                print("Reached end of the video file. Exiting program.")
+                return None
+            return frame
+        if self.source_type == "usb":
+            ret, frame = self.cap.read()  # type:ignore
+            if (frame is None) or (not ret):
+                print("Camera error. Exiting.")
+                return None
+            return frame
+        frame = self.cap.capture_array()  # type:ignore
+        if frame is None:
+            print("Camera error. Exiting.")
+        return frame
+
+    def step_back(self, count: int):
+        if self.source_type in ["image", "folder"]:
+            self.index = max(0, self.index - count)
+
+    def release(self):
+        if self.cap is None:
+            return
+        if self.source_type in ["video", "usb"]:
+            self.cap.release()  # type:ignore
+        elif self.source_type == "picamera":
+            self.cap.stop()  # type:ignore
@@ -0,0 +1,45 @@
+import os
+
+# Argument checks that don't need OpenCV, so the CLI can reject bad input
+# before paying for heavy imports.
+
+IMG_EXT_LIST = [".jpg", ".JPG", ".jpeg", ".JPEG", ".png", ".PNG", ".bmp", ".BMP"]
+VID_EXT_LIST = [".avi", ".mov", ".mp4", ".mkv", ".wmv"]
+STREAM_TYPES = ["video", "usb", "picamera"]
+
+
+class SourceError(ValueError):
+    pass
+
+
+def resolve_source(img_source: str) -> tuple:
+    """Classifies --source without opening it, returning (source_type, arg)."""
+    if os.path.isdir(img_source):
+        return "folder", img_source
+    if os.path.isfile(img_source):
+        _, ext = os.path.splitext(img_source)
+        if ext in IMG_EXT_LIST:
+            return "image", img_source
+        if ext in VID_EXT_LIST:
+            return "video", img_source
+        raise SourceError(f"File extension {ext} is not supported.")
+    try:
+        if "usb" in img_source:
+            return "usb", int(img_source[3:])
+        if "picamera" in img_source:
+            return "picamera", int(img_source[8:])
+    except ValueError:
+        pass
+    raise SourceError(f"Input {img_source} is invalid. Please try again.")
+
+
+def parse_resolution(user_res: str | None) -> tuple | None:
+    if not user_res:
+        return None
+    try:
+        parts = user_res.split("x")
+        if len(parts) != 2:
+            raise ValueError
+        return int(parts[0]), int(parts[1])
+    except (ValueError, IndexError):
+        raise SourceError("ERROR: Resolution must be in format WxH (e.g., 640x480).")
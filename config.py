@@ -0,0 +1,121 @@
+import json
+import os
+
+import numpy as np
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def load_config(path: str = CONFIG_PATH) -> dict:
+    """Reads config.json, raising ValueError for missing or mistyped keys."""
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError(f"Config {path} must be a JSON object")
+    for key in ("model_path", "min_thresh", "nutrition"):
+        if key not in config:
+            raise ValueError(f"Config {path} is missing '{key}'")
+    config.setdefault("class_thresh", {})
+    config.setdefault("max_det", 300)
+    config.setdefault("imgsz", 640)
+
+    if not isinstance(config["model_path"], str):
+        raise ValueError(f"Config {path}: 'model_path' must be a string")
+    if not _is_number(config["min_thresh"]):
+        raise ValueError(f"Config {path}: 'min_thresh' must be a number")
+    config["min_thresh"] = float(config["min_thresh"])
+    for key in ("max_det", "imgsz"):
+        value = config[key]
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            raise ValueError(f"Config {path}: '{key}' must be a positive integer")
+    if not isinstance(config["class_thresh"], dict) or not all(
+        _is_number(v) for v in config["class_thresh"].values()
+    ):
+        raise ValueError(f"Config {path}: 'class_thresh' must map names to numbers")
+    if not isinstance(config["nutrition"], dict) or not all(
+        isinstance(v, list) and len(v) == 2 and all(_is_number(x) for x in v)
+        for v in config["nutrition"].values()
+    ):
+        raise ValueError(
+            f"Config {path}: 'nutrition' must map names to [calories, sugar]"
+        )
+    return config
+
+
+def normalize_name(name: str) -> str:
+    return name.replace("-", "_").replace(" ", "_").lower()
+
+
+class NutritionTable:
+    """Nutrition values laid out by model class id.
+
+    Names are matched loosely ("Kit-Kat", "Kit_Kat" and "Kit Kat" are the same
+    candy), so totals for a set of detections are two dot products over the
+    per-class counts instead of per-detection dictionary lookups.
+    """
+
+    def __init__(self, nutrition: dict, names: dict):
+        lookup = {normalize_name(name): values for name, values in nutrition.items()}
+        size = max(names) + 1 if names else 0
+
+        calories = [0] * size
+        sugar = [0] * size
+        known = [False] * size
+        for idx, name in names.items():
+            values = lookup.get(normalize_name(name))
+            if values is None:
+                continue
+            calories[idx], sugar[idx] = values
+            known[idx] = True
+
+        self.names = names
+        self.calories = np.array(calories)
+        self.sugar = np.array(sugar)
+        self.known = np.array(known, dtype=bool)
+        self.known_ids = [idx for idx in sorted(names) if known[idx]]
+
+    def counts(self, class_ids) -> np.ndarray:
+        class_ids = np.asarray(class_ids, dtype=np.intp)
+        return np.bincount(class_ids, minlength=len(self.calories))
+
+    def totals(self, counts: np.ndarray) -> tuple:
+        counts = counts * self.known
+        return (counts @ self.calories).item(), (counts @ self.sugar).item()
+
+    def counts_by_name(self, counts: np.ndarray) -> dict:
+        return {self.names[idx]: int(counts[idx]) for idx in self.known_ids}
+
+
+def compile_thresholds(class_thresh: dict, names: dict, default: float) -> np.ndarray:
+    """Confidence cut-offs indexed by class id, `default` where none is set."""
+    lookup = {normalize_name(name): float(t) for name, t in class_thresh.items()}
+    thresholds = np.full(max(names) + 1 if names else 0, float(default))
+    for idx, name in names.items():
+        thresholds[idx] = lookup.get(normalize_name(name), default)
+    return thresholds
+
+
+def inference_kwargs(thresholds: np.ndarray, max_det: int, imgsz: int) -> dict:
+    # The model drops everything under the loosest class cut-off during NMS, so
+    # only candidates that some class could still accept leave the model call.
+    conf = float(thresholds.min()) if len(thresholds) else 0.25
+    return {"conf": conf, "max_det": int(max_det), "imgsz": int(imgsz)}
+
+
+RISK_LEVELS = [
+    (100, "Safe"),
+    (200, "Moderate"),
+    (400, "High"),
+    (700, "Excessive"),
+]
+
+
+def classify_calories(total_calories: float) -> str:
+    for limit, label in RISK_LEVELS:
+        if total_calories <= limit:
+            return label
+    return "Extreme"
@@ -0,0 +1,414 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from config import NutritionTable, compile_thresholds, load_config
+from profiling import current_rss_mb
+
+IMG_EXT_LIST = [".jpg", ".jpeg", ".png", ".bmp"]
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+TRAIN_RESULTS = "my_model (1)/train3/results.csv"
+
+# Keys accepted in a --run spec and how to parse them.
+RUN_KEYS = {
+    "name": str,
+    "model": str,
+    "imgsz": int,
+    "half": lambda v: v.lower() in ("1", "true", "yes"),
+    "skip": int,
+    "conf": float,
+    "max_det": int,
+}
+
+
+def parse_run(spec: str, config: dict) -> dict:
+    run = {
+        "model": config["model_path"],
+        "imgsz": config["imgsz"],
+        "half": False,
+        "skip": 0,
+        "conf": None,
+        "max_det": config["max_det"],
+    }
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, sep, value = item.partition("=")
+        if not sep or key not in RUN_KEYS:
+            raise ValueError(
+                f"Invalid run option '{item}', expected one of {list(RUN_KEYS)}"
+            )
+        run[key] = RUN_KEYS[key](value)
+    run.setdefault(
+        "name",
+        f"{os.path.basename(run['model'].rstrip('/'))}@{run['imgsz']}"
+        + (f"+skip{run['skip']}" if run["skip"] else "")
+        + ("+half" if run["half"] else ""),
+    )
+    return run
+
+
+def resolve_images(data: str) -> tuple:
+    """Returns (image paths, class names or None) for a data.yaml or image folder."""
+    names = None
+    if data.endswith((".yaml", ".yml")):
+        import yaml  # type:ignore
+
+        with open(data, "r", encoding="utf-8") as f:
+            spec = yaml.safe_load(f)
+        root = spec.get("path") or os.path.dirname(os.path.abspath(data))
+        image_dir = os.path.join(root, spec["val"])
+        names = spec.get("names")
+        if isinstance(names, list):
+            names = dict(enumerate(names))
+    elif os.path.isdir(os.path.join(data, "images")):
+        image_dir = os.path.join(data, "images")
+    else:
+        image_dir = data
+
+    images = sorted(
+        path
+        for path in glob.glob(os.path.join(image_dir, "**", "*"), recursive=True)
+        if os.path.splitext(path)[1].lower() in IMG_EXT_LIST
+    )
+    return images, names
+
+
+def label_path(image_path: str) -> str:
+    # YOLO layout: .../images/x.jpg -> .../labels/x.txt
+    head, sep, tail = image_path.rpartition(f"{os.sep}images{os.sep}")
+    base = os.path.splitext(tail if sep else image_path)[0] + ".txt"
+    return os.path.join(head, "labels", base) if sep else base
+
+
+def load_labels(image_path: str, width: int, height: int) -> tuple:
+    path = label_path(image_path)
+    if not os.path.exists(path):
+        return np.zeros(0, dtype=int), np.zeros((0, 4))
+    rows = np.loadtxt(path, ndmin=2)
+    if rows.size == 0:
+        return np.zeros(0, dtype=int), np.zeros((0, 4))
+    cx, w = rows[:, 1] * width, rows[:, 3] * width
+    cy, h = rows[:, 2] * height, rows[:, 4] * height
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    return rows[:, 0].astype(int), boxes
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+    area_a = (a[:, 2:] - a[:, :2]).prod(axis=1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def match_predictions(pred_cls, pred_boxes, gt_cls, gt_boxes) -> np.ndarray:
+    """True-positive matrix of shape (predictions, IoU thresholds)."""
+    correct = np.zeros((len(pred_cls), len(IOU_THRESHOLDS)), dtype=bool)
+    if len(pred_cls) == 0 or len(gt_cls) == 0:
+        return correct
+    iou = box_iou(gt_boxes, pred_boxes) * (gt_cls[:, None] == pred_cls[None, :])
+    for i, threshold in enumerate(IOU_THRESHOLDS):
+        gt_idx, pred_idx = np.nonzero(iou >= threshold)
+        if len(gt_idx) == 0:
+            continue
+        order = iou[gt_idx, pred_idx].argsort()[::-1]
+        gt_idx, pred_idx = gt_idx[order], pred_idx[order]
+        _, first = np.unique(pred_idx, return_index=True)
+        gt_idx, pred_idx = gt_idx[first], pred_idx[first]
+        _, first = np.unique(gt_idx, return_index=True)
+        correct[pred_idx[first], i] = True
+    return correct
+
+
+def average_precision(recall: np.ndarray, precision: np.ndarray) -> float:
+    # COCO-style 101-point interpolation: at each recall level take the best
+    # precision reached at that recall or beyond.
+    envelope = np.flip(np.maximum.accumulate(np.flip(precision)))
+    idx = np.searchsorted(recall, np.linspace(0, 1, 101), side="left")
+    values = envelope[np.minimum(idx, len(recall) - 1)]
+    return float(np.where(idx < len(recall), values, 0.0).mean())
+
+
+def class_metrics(
+    tp, conf, pred_cls, gt_cls, classes, thresholds: np.ndarray
+) -> dict:
+    metrics = {}
+    order = np.argsort(-conf)
+    tp, conf, pred_cls = tp[order], conf[order], pred_cls[order]
+    for c in classes:
+        is_class = pred_cls == c
+        n_gt = int((gt_cls == c).sum())
+        n_pred = int(is_class.sum())
+        if n_gt == 0 and n_pred == 0:
+            continue
+        ap = np.zeros(len(IOU_THRESHOLDS))
+        precision = recall = 0.0
+        if n_pred and n_gt:
+            tpc = tp[is_class].cumsum(axis=0)
+            fpc = (~tp[is_class]).cumsum(axis=0)
+            recall_curve = tpc / n_gt
+            precision_curve = tpc / (tpc + fpc)
+            for i in range(len(IOU_THRESHOLDS)):
+                ap[i] = average_precision(recall_curve[:, i], precision_curve[:, i])
+            kept = conf[is_class] > thresholds[c]
+            hits = int(tp[is_class][kept, 0].sum())
+            precision = hits / kept.sum() if kept.sum() else 0.0
+            recall = hits / n_gt
+        metrics[int(c)] = {
+            "instances": n_gt,
+            "precision": float(precision),
+            "recall": float(recall),
+            "mAP50": float(ap[0]),
+            "mAP50-95": float(ap.mean()),
+        }
+    return metrics
+
+
+def load_model(run: dict):
+    from ultralytics import YOLO  # type:ignore
+
+    model = YOLO(run["model"], task="detect")
+    # Warm up so one-off initialisation doesn't land in the latency numbers.
+    blank = np.zeros((run["imgsz"], run["imgsz"], 3), np.uint8)
+    model(blank, imgsz=run["imgsz"], verbose=False)
+    return model
+
+
+def collect_predictions(model, images: list, run: dict) -> tuple:
+    """Low-confidence predictions and ground truth for every readable image.
+
+    Returns (records, latencies); each record is
+    (pred_cls, conf, pred_boxes, gt_cls, gt_boxes).
+    """
+    records = []
+    latencies = []
+    previous = None
+    for idx, path in enumerate(images):
+        frame = cv2.imread(path)
+        if frame is None:
+            print(f"WARNING: Could not read {path}, skipping.")
+            continue
+        height, width = frame.shape[:2]
+        gt_cls, gt_boxes = load_labels(path, width, height)
+
+        t_start = time.perf_counter()
+        if previous is None or idx % (run["skip"] + 1) == 0:
+            result = model(
+                frame,
+                imgsz=run["imgsz"],
+                half=run["half"],
+                conf=0.001,
+                max_det=run["max_det"],
+                verbose=False,
+            )[0]
+            boxes = result.boxes
+            previous = (
+                boxes.cls.cpu().numpy().astype(int),
+                boxes.conf.cpu().numpy(),
+                boxes.xyxy.cpu().numpy(),
+            )
+        latencies.append(time.perf_counter() - t_start)
+        records.append((*previous, gt_cls, gt_boxes))
+
+    if not records:
+        raise ValueError("None of the images could be read")
+    return records, np.array(latencies)
+
+
+def evaluate_run(run: dict, images: list, names: dict | None, config: dict) -> dict:
+    # Runs share one process, so memory is reported as the growth over this run
+    # with its model still loaded, not the process-wide peak.
+    rss_before = current_rss_mb()
+    model = load_model(run)
+    names = names or model.names
+    nutrition = NutritionTable(config["nutrition"], names)
+    if run["conf"] is None:
+        thresholds = compile_thresholds(
+            config["class_thresh"], names, config["min_thresh"]
+        )
+    else:
+        thresholds = compile_thresholds({}, names, run["conf"])
+
+    records, latencies = collect_predictions(model, images, run)
+    rss_delta = current_rss_mb() - rss_before
+
+    stats = []
+    calorie_errors = []
+    for pred_cls, conf, pred_boxes, gt_cls, gt_boxes in records:
+        tp = match_predictions(pred_cls, pred_boxes, gt_cls, gt_boxes)
+        stats.append((tp, conf, pred_cls, gt_cls))
+
+        kept = conf > thresholds[pred_cls]
+        pred_calories, _ = nutrition.totals(nutrition.counts(pred_cls[kept]))
+        true_calories, _ = nutrition.totals(nutrition.counts(gt_cls))
+        calorie_errors.append(pred_calories - true_calories)
+
+    tp, conf, pred_cls, gt_cls = (np.concatenate(column) for column in zip(*stats))
+    classes = np.unique(np.concatenate([pred_cls, gt_cls]))
+    per_class = class_metrics(tp, conf, pred_cls, gt_cls, classes, thresholds)
+    evaluated = [m for m in per_class.values() if m["instances"]]
+    calorie_errors = np.abs(np.array(calorie_errors))
+
+    return {
+        "run": run,
+        "images": len(latencies),
+        "precision": float(np.mean([m["precision"] for m in evaluated])),
+        "recall": float(np.mean([m["recall"] for m in evaluated])),
+        "mAP50": float(np.mean([m["mAP50"] for m in evaluated])),
+        "mAP50-95": float(np.mean([m["mAP50-95"] for m in evaluated])),
+        "calorie_mae": float(calorie_errors.mean()),
+        "calorie_exact": float((calorie_errors == 0).mean()),
+        "latency_ms": float(latencies.mean() * 1000),
+        "latency_p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "throughput": float(len(latencies) / latencies.sum()),
+        "rss_delta_mb": rss_delta,
+        "per_class": {names[c]: m for c, m in per_class.items()},
+    }
+
+
+def pareto_front(reports: list) -> list:
+    """Indices of runs not beaten on accuracy, calorie error and latency at once."""
+    front = []
+    for i, a in enumerate(reports):
+        dominated = any(
+            b["mAP50-95"] >= a["mAP50-95"]
+            and b["calorie_mae"] <= a["calorie_mae"]
+            and b["latency_ms"] <= a["latency_ms"]
+            and (
+                b["mAP50-95"] > a["mAP50-95"]
+                or b["calorie_mae"] < a["calorie_mae"]
+                or b["latency_ms"] < a["latency_ms"]
+            )
+            for j, b in enumerate(reports)
+            if j != i
+        )
+        if not dominated:
+            front.append(i)
+    return front
+
+
+def read_train_results(path: str = TRAIN_RESULTS) -> dict | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [
+                {k.strip(): v for k, v in row.items()} for row in csv.DictReader(f)
+            ]
+    except (OSError, csv.Error):
+        return None
+    if not rows or "metrics/mAP50(B)" not in rows[-1]:
+        return None
+    last = rows[-1]
+    return {
+        "epoch": int(float(last["epoch"])),
+        "precision": float(last["metrics/precision(B)"]),
+        "recall": float(last["metrics/recall(B)"]),
+        "mAP50": float(last["metrics/mAP50(B)"]),
+        "mAP50-95": float(last["metrics/mAP50-95(B)"]),
+    }
+
+
+def print_report(reports: list, front: list, train_results: dict | None):
+    header = f"{'run':<32} {'mAP50':>6} {'50-95':>6} {'P':>6} {'R':>6} {'cal MAE':>8} {'ms/img':>7} {'p95':>7} {'img/s':>6} {'+RSS MB':>7}"
+    print(header)
+    print("-" * len(header))
+    for i, r in enumerate(reports):
+        marker = "*" if i in front else " "
+        print(
+            f"{marker}{r['run']['name'][:31]:<31} {r['mAP50']:6.3f} {r['mAP50-95']:6.3f} "
+            f"{r['precision']:6.3f} {r['recall']:6.3f} {r['calorie_mae']:8.1f} "
+            f"{r['latency_ms']:7.1f} {r['latency_p95_ms']:7.1f} {r['throughput']:6.1f} "
+            f"{r['rss_delta_mb']:+7.0f}"
+        )
+    print("* = Pareto-optimal (mAP50-95, calorie MAE, latency)")
+
+    if train_results:
+        print(
+            f"Training-time validation (epoch {train_results['epoch']}): "
+            f"mAP50 {train_results['mAP50']:.3f}, mAP50-95 {train_results['mAP50-95']:.3f}"
+        )
+
+    for r in reports:
+        print(f"\n{r['run']['name']} per class:")
+        for name, m in r["per_class"].items():
+            print(
+                f"  {name:<12} n={m['instances']:<4} P {m['precision']:.3f}  R {m['recall']:.3f}  "
+                f"mAP50 {m['mAP50']:.3f}  mAP50-95 {m['mAP50-95']:.3f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare accuracy and speed of model/backend/config combinations."
+    )
+    parser.add_argument(
+        "--data",
+        help='Labeled validation set: a YOLO data.yaml, or a folder with images/ and labels/ (example: "datasets/candy/valid")',
+        required=True,
+    )
+    parser.add_argument(
+        "--run",
+        help='Configuration to evaluate as comma-separated key=value pairs (keys: name, model, imgsz, half, skip, conf, max_det), can be repeated (example: "model=best.onnx,imgsz=416")',
+        action="append",
+        default=None,
+    )
+    parser.add_argument(
+        "--limit",
+        help="Only evaluate the first N images",
+        type=int,
+        default=0,
+    )
+    parser.add_argument(
+        "--output",
+        help='Write the full report as JSON (example: "eval_report.json")',
+        default=None,
+    )
+    args = parser.parse_args()
+
+    config = load_config()
+    try:
+        runs = [parse_run(spec, config) for spec in args.run or [""]]
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    images, names = resolve_images(args.data)
+    if args.limit:
+        images = images[: args.limit]
+    if not images:
+        print(f"ERROR: No images found for {args.data}.")
+        sys.exit(1)
+    print(f"Evaluating {len(runs)} configuration(s) on {len(images)} images")
+
+    reports = []
+    for run in runs:
+        print(f"Running {run['name']}...")
+        reports.append(evaluate_run(run, images, names, config))
+
+    front = pareto_front(reports)
+    train_results = read_train_results()
+    print()
+    print_report(reports, front, train_results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "runs": reports,
+                    "pareto": [reports[i]["run"]["name"] for i in front],
+                    "train_results": train_results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+from ultralytics import YOLO  # type:ignore
+
+from config import (
+    CONFIG_PATH,
+    NutritionTable,
+    compile_thresholds,
+    inference_kwargs,
+    load_config,
+)
+
+
+class ModelState(NamedTuple):
+    model: object
+    names: dict
+    model_path: str
+    min_thresh: float
+    thresholds: np.ndarray
+    max_det: int
+    imgsz: int
+    nutrition: NutritionTable
+    config: dict
+
+    def predict(self, source):
+        kwargs = inference_kwargs(self.thresholds, self.max_det, self.imgsz)
+        return self.model(source, verbose=False, **kwargs)  # type:ignore
+
+
+def warm_up(model, imgsz: int):
+    model(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), verbose=False)
+
+
+class ModelManager:
+    """Owns the active model and swaps in a new one when the config changes.
+
+    Handlers grab `manager.current` once per request and use that snapshot
+    throughout, so a request that started on the old model finishes on it while
+    the replacement is loaded and warmed on the watcher thread.
+    """
+
+    def __init__(self, config_path: str = CONFIG_PATH, poll_interval: float = 2.0):
+        self.config_path = config_path
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._stamp = self._file_stamp()
+        self.current = self._build(load_config(config_path), None)
+
+    def _file_stamp(self) -> tuple:
+        config_mtime = os.path.getmtime(self.config_path)
+        try:
+            model_path = load_config(self.config_path)["model_path"]
+            model_mtime = os.path.getmtime(model_path)
+        except (OSError, ValueError):
+            model_mtime = None
+        return config_mtime, model_mtime
+
+    def _build(self, config: dict, previous, force_model: bool = False) -> ModelState:
+        if (
+            previous is not None
+            and not force_model
+            and previous.model_path == config["model_path"]
+            and previous.imgsz == config["imgsz"]
+        ):
+            model = previous.model
+        else:
+            if not os.path.exists(config["model_path"]):
+                raise FileNotFoundError(f"Model not found: {config['model_path']}")
+            model = YOLO(config["model_path"], task="detect")
+            warm_up(model, config["imgsz"])
+
+        return ModelState(
+            model=model,
+            names=model.names,  # type:ignore
+            model_path=config["model_path"],
+            min_thresh=config["min_thresh"],
+            thresholds=compile_thresholds(
+                config["class_thresh"],
+                model.names,  # type:ignore
+                config["min_thresh"],
+            ),
+            max_det=config["max_det"],
+            imgsz=config["imgsz"],
+            nutrition=NutritionTable(config["nutrition"], model.names),  # type:ignore
+            config=config,
+        )
+
+    def reload(self, force_model: bool = False) -> bool:
+        with self._lock:
+            t_start = time.perf_counter()
+            try:
+                config = load_config(self.config_path)
+                state = self._build(config, self.current, force_model)
+            except Exception as e:
+                print(f"Config reload failed, keeping current model: {e}")
+                return False
+            self.current = state
+            print(
+                f"Reloaded config from {self.config_path} in "
+                f"{time.perf_counter() - t_start:.2f}s (model: {state.model_path})"
+            )
+            return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            # An unexpected error must not end the thread, or hot reload would
+            # stop silently until the server restarts.
+            try:
+                stamp = self._file_stamp()
+                if stamp == self._stamp:
+                    continue
+                # Weights replaced in place under the same path still need a reload.
+                model_changed = stamp[1] != self._stamp[1]
+                self._stamp = stamp
+                self.reload(force_model=model_changed)
+            except OSError:
+                continue
+            except Exception as e:
+                print(f"Config watcher error, still watching: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,132 @@
+import queue
+import struct
+
+import cv2
+import numpy as np
+
+REDUCED_FLAGS = [
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+]
+
+# JPEG start-of-frame markers; C4, C8 and CC share the range but are not frames.
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+class BufferPool:
+    """Reusable request buffers so each upload doesn't allocate a fresh body.
+
+    Requests larger than `size` get a one-off buffer that is not kept.
+    """
+
+    def __init__(self, size: int, count: int = 4):
+        self.size = size
+        self._free = queue.LifoQueue(maxsize=count)
+
+    def acquire(self, length: int) -> bytearray:
+        if length > self.size:
+            return bytearray(length)
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            return bytearray(self.size)
+
+    def release(self, buf: bytearray):
+        if len(buf) != self.size:
+            return
+        try:
+            self._free.put_nowait(buf)
+        except queue.Full:
+            pass
+
+
+def read_into(fileobj, buf: bytearray, length: int) -> memoryview:
+    # A negative length would slice a pooled buffer from the end and hand back
+    # bytes left over from an earlier request.
+    if length < 0 or length > len(buf):
+        raise ValueError(f"Invalid request body length {length}")
+    view = memoryview(buf)[:length]
+    received = 0
+    while received < length:
+        n = fileobj.readinto(view[received:])
+        if not n:
+            raise ValueError(f"Request body ended after {received} of {length} bytes")
+        received += n
+    return view
+
+
+def read_image_size(data) -> tuple | None:
+    """Width and height from a JPEG, PNG or BMP header, or None if unknown."""
+    header = bytes(data[:32])
+    if header.startswith(b"\x89PNG\r\n\x1a\n") and len(header) >= 24:
+        return struct.unpack(">II", header[16:24])
+    if header.startswith(b"BM") and len(header) >= 26:
+        width, height = struct.unpack("<ii", header[18:26])
+        return abs(width), abs(height)
+    if header.startswith(b"\xff\xd8"):
+        return _read_jpeg_size(data)
+    return None
+
+
+def _read_jpeg_size(data) -> tuple | None:
+    pos = 2
+    size = len(data)
+    while pos + 4 <= size:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        (segment_length,) = struct.unpack(">H", bytes(data[pos + 2 : pos + 4]))
+        if marker in JPEG_SOF_MARKERS:
+            if pos + 9 > size:
+                return None
+            height, width = struct.unpack(">HH", bytes(data[pos + 5 : pos + 9]))
+            return width, height
+        pos += 2 + segment_length
+    return None
+
+
+def decode_image(
+    image_bytes, imgsz: int = 640, max_pixels: int = 0, reduce: bool = True
+) -> tuple:
+    """Decode an encoded image, returning (frame, scale).
+
+    When the header says the image is several times larger than the inference
+    size, it is decoded at 1/2, 1/4 or 1/8 resolution. `scale` maps coordinates
+    on the returned frame back to the original image.
+    """
+    size = read_image_size(image_bytes)
+    if size is not None and max_pixels and size[0] * size[1] > max_pixels:
+        raise ImageTooLarge(
+            f"Image is {size[0]}x{size[1]}, limit is {max_pixels} pixels"
+        )
+
+    flags = cv2.IMREAD_COLOR
+    if reduce and size is not None:
+        for factor, reduced_flag in REDUCED_FLAGS:
+            if max(size) // factor >= imgsz:
+                flags = reduced_flag
+                break
+
+    nparr = np.frombuffer(image_bytes, np.uint8)
+    frame = cv2.imdecode(nparr, flags)
+    if frame is None:
+        raise ValueError("Could not decode image")
+    if size is None:
+        if max_pixels and frame.shape[0] * frame.shape[1] > max_pixels:
+            raise ImageTooLarge(
+                f"Image is {frame.shape[1]}x{frame.shape[0]}, limit is {max_pixels} pixels"
+            )
+        return frame, 1.0
+    # max() keeps the scale right when EXIF orientation swaps width and height.
+    return frame, max(size) / max(frame.shape[:2])
@@ -0,0 +1,86 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Skips inference while a downscaled grayscale view of the scene is unchanged.
+
+    Each frame is compared against the frame that was last sent to the model, so
+    slow drift still triggers a refresh once it accumulates past the thresholds.
+    """
+
+    def __init__(
+        self,
+        pixel_thresh: int = 25,
+        area_thresh: float = 0.01,
+        size: tuple = (64, 48),
+        max_skip: int = 150,
+    ):
+        self.pixel_thresh = pixel_thresh
+        self.area_thresh = area_thresh
+        self.size = size
+        self.max_skip = max_skip
+
+        self._reference = None
+        self._since_inference = 0
+
+        self.frames = 0
+        self.skipped = 0
+        self.inferences = 0
+        self.gate_time = 0.0
+        self.inference_time = 0.0
+
+    def _prepare(self, frame) -> np.ndarray:
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def should_infer(self, frame) -> bool:
+        t_start = time.perf_counter()
+        current = self._prepare(frame)
+        self.frames += 1
+
+        changed = True
+        expired = self.max_skip > 0 and self._since_inference >= self.max_skip
+        if self._reference is not None and not expired:
+            diff = cv2.absdiff(current, self._reference)
+            fraction = float(np.count_nonzero(diff > self.pixel_thresh)) / diff.size
+            changed = fraction >= self.area_thresh
+
+        if changed:
+            self._reference = current
+            self._since_inference = 0
+        else:
+            self.skipped += 1
+            self._since_inference += 1
+
+        self.gate_time += time.perf_counter() - t_start
+        return changed
+
+    def record_inference(self, seconds: float):
+        self.inferences += 1
+        self.inference_time += seconds
+
+    @property
+    def skip_ratio(self) -> float:
+        return self.skipped / self.frames if self.frames else 0.0
+
+    @property
+    def avg_inference_time(self) -> float:
+        return self.inference_time / self.inferences if self.inferences else 0.0
+
+    @property
+    def time_saved(self) -> float:
+        return self.skipped * self.avg_inference_time - self.gate_time
+
+    def summary(self) -> str:
+        return (
+            f"Motion gate: skipped {self.skipped}/{self.frames} frames "
+            f"({self.skip_ratio * 100:.1f}%), "
+            f"avg inference {self.avg_inference_time * 1000:.1f} ms, "
+            f"gate overhead {self.gate_time * 1000:.1f} ms, "
+            f"est. inference time saved {max(self.time_saved, 0.0):.2f} s"
+        )
@@ -3,19 +3,16 @@ import sys
 import cv2
 from ultralytics import YOLO
 
+# Nutrition values come from config.json in the project root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import NutritionTable, load_config
+
 model_path = 'yolo11s_candy_model.pt'
 min_thresh = 0.50
 cam_index = 0
 imgW, imgH = 1280, 720
 record = False
 
-nutrition_info = nutrition_info = {
-    'Bar_One': [201, 21],
-    'Gems': [50, 9],
-    'Kit_Kat': [106, 11],
-    'Milky_Bar': [137, 14]
-}
-
 
 if (not os.path.exists(model_path)):
     print('WARNING: Model path is invalid or model was not found.')
@@ -23,6 +20,7 @@ if (not os.path.exists(model_path)):
 
 model = YOLO(model_path, task='detect')
 labels = model.names
+nutrition = NutritionTable(load_config()['nutrition'], labels)
 
 cap = cv2.VideoCapture(cam_index)
 ret = cap.set(3, imgW)
@@ -45,6 +43,7 @@ while True:
     results = model.track(frame, verbose=False)
     detections = results[0].boxes
     candies_detected = []
+    detected_ids = []
 
     for i in range(len(detections)):
         xyxy_tensor = detections[i].xyxy.cpu()
@@ -65,14 +64,9 @@ while True:
             cv2.rectangle(frame, (xmin, label_ymin-labelSize[1]-10), (xmin+labelSize[0], label_ymin+baseLine-10), color, cv2.FILLED)
             cv2.putText(frame, label, (xmin, label_ymin-7), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1)
             candies_detected.append(classname)
+            detected_ids.append(classidx)
     
-    total_calories = 0
-    total_sugar = 0
-
-    for candy_name in candies_detected:
-        calories, sugar = nutrition_info[candy_name]
-        total_calories += calories
-        total_sugar += sugar
+    total_calories, total_sugar = nutrition.totals(nutrition.counts(detected_ids))
 
     cv2.rectangle(frame, (10, 10), (450, 130), (50,50,50), cv2.FILLED)
     cv2.putText(frame, f'Number of candies: {len(candies_detected)}', (20,40), cv2.FONT_HERSHEY_SIMPLEX, 1, (255,102,51), 2)
@@ -8,6 +8,10 @@ import cv2
 import numpy as np
 from ultralytics import YOLO
 
+# Nutrition values come from config.json in the project root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import NutritionTable, load_config
+
 parser = argparse.ArgumentParser()
 parser.add_argument('--model', help='Path to YOLO model file (example: "runs/detect/train/weights/best.pt")', required=True)
 parser.add_argument('--source', help='Image source, can be image file ("test.jpg"), image folder ("test_dir"), video file ("testvid.mp4"), index of USB camera ("usb0"), or index of Picamera ("picamera0")', required=True)
@@ -17,13 +21,6 @@ parser.add_argument('--record', help='Record results from video or webcam and sa
 
 args = parser.parse_args()
 
-nutrition_info = {
-    'Bar_One': [201, 21],
-    'Gems': [50, 9],
-    'Kit-Kat': [106, 11],
-    'Milky_Bar': [137, 14]
-}
-
 model_path = args.model
 img_source = args.source
 min_thresh = float(args.thresh)
@@ -36,6 +33,7 @@ if (not os.path.exists(model_path)):
 
 model = YOLO(model_path, task='detect')
 labels = model.names
+nutrition = NutritionTable(load_config()['nutrition'], labels)
 
 print("Detected YOLO classes:", labels)
 
@@ -144,7 +142,7 @@ while True:
     detections = results[0].boxes
 
     candies_detected = []
-    candy_counts = {name: 0 for name in nutrition_info}
+    detected_ids = []
 
     for i in range(len(detections)):
         xyxy_tensor = detections[i].xyxy.cpu()
@@ -164,11 +162,11 @@ while True:
                           (xmin + labelSize[0], label_ymin + baseLine - 10), color, cv2.FILLED)
             cv2.putText(frame, label, (xmin, label_ymin - 7), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1)
             candies_detected.append(classname)
-            if classname in candy_counts:
-                candy_counts[classname] += 1
+            detected_ids.append(classidx)
 
-    total_calories = sum(nutrition_info[c][0] * n for c, n in candy_counts.items())
-    total_sugar = sum(nutrition_info[c][1] * n for c, n in candy_counts.items())
+    counts = nutrition.counts(detected_ids)
+    candy_counts = nutrition.counts_by_name(counts)
+    total_calories, total_sugar = nutrition.totals(counts)
 
     cv2.rectangle(frame, (10, 10), (450, 200), (50, 50, 50), cv2.FILLED)
     cv2.putText(frame, f'Number of candies: {sum(candy_counts.values())}', (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 102, 51), 2)
@@ -0,0 +1,49 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+def current_rss_mb() -> float:
+    # Resident set size right now; ru_maxrss only ever reports the peak.
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return 0.0
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class StartupProfile:
+    """Wall-clock timeline of startup phases, which may overlap across threads."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.phases = []
+        self.marks = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter() - self.origin
+        try:
+            yield
+        finally:
+            end = time.perf_counter() - self.origin
+            with self._lock:
+                self.phases.append((name, threading.current_thread().name, start, end))
+
+    def mark(self, name: str):
+        with self._lock:
+            self.marks.append((name, time.perf_counter() - self.origin))
+
+    def report(self) -> str:
+        lines = ["Startup profile:"]
+        for name, thread, start, end in sorted(self.phases, key=lambda p: p[2]):
+            lines.append(
+                f"  {name:<22} {start:7.3f}s -> {end:7.3f}s "
+                f"({(end - start) * 1000:7.1f} ms) [{thread}]"
+            )
+        for name, at in self.marks:
+            lines.append(f"  {name:<22} {at:7.3f}s")
+        return "\n".join(lines)
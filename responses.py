@@ -0,0 +1,126 @@
+import json
+
+import numpy as np
+
+from config import classify_calories
+
+try:
+    import msgpack  # type:ignore
+except ImportError:
+    msgpack = None
+
+ENVELOPE = "envelope"
+LEAN = "lean"
+MSGPACK = "msgpack"
+
+LEAN_JSON_TYPE = "application/vnd.candy.lean+json"
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def negotiate(accept: str | None) -> str:
+    """Pick a response format from the Accept header.
+
+    Clients that don't ask for anything specific keep the original
+    {"content": [{"type": "text", ...}]} envelope.
+    """
+    accept = (accept or "").lower()
+    if msgpack is not None and any(t in accept for t in MSGPACK_TYPES):
+        return MSGPACK
+    if LEAN_JSON_TYPE in accept:
+        return LEAN
+    return ENVELOPE
+
+
+def extract_arrays(result, state, scale: float = 1.0, verbose: bool = False) -> dict:
+    boxes = result.boxes
+    class_ids = boxes.cls.cpu().numpy().astype(int)
+    confidences = boxes.conf.cpu().numpy()
+    xyxy = (boxes.xyxy.cpu().numpy() * scale).astype(int)
+
+    if verbose:
+        for classidx, conf, (xmin, ymin, xmax, ymax) in zip(
+            class_ids, confidences, xyxy
+        ):
+            print(
+                f"Detection: {state.names[classidx]} @ {conf:.3f} | bbox: [{xmin}, {ymin}, {xmax}, {ymax}]"
+            )
+
+    keep = confidences > state.thresholds[class_ids]
+    return {
+        "class_id": class_ids[keep],
+        "confidence": confidences[keep],
+        "bbox": xyxy[keep],
+    }
+
+
+def to_detections(arrays: dict, state) -> list:
+    return [
+        {
+            "candy": state.names[classidx],
+            "confidence": round(float(conf), 3),
+            "bbox": bbox.tolist(),
+        }
+        for classidx, conf, bbox in zip(
+            arrays["class_id"], arrays["confidence"], arrays["bbox"]
+        )
+    ]
+
+
+def to_lean(arrays: dict, state) -> dict:
+    counts = state.nutrition.counts(arrays["class_id"])
+    total_calories, total_sugar = state.nutrition.totals(counts)
+    return {
+        "candy": [state.names[classidx] for classidx in arrays["class_id"]],
+        "class_id": arrays["class_id"].tolist(),
+        "confidence": np.round(arrays["confidence"], 3).tolist(),
+        # Flattened [xmin, ymin, xmax, ymax, ...], four values per detection.
+        "bbox": arrays["bbox"].ravel().tolist(),
+        "counts": {
+            name: count
+            for name, count in state.nutrition.counts_by_name(counts).items()
+            if count
+        },
+        "total_count": len(arrays["class_id"]),
+        "total_calories": total_calories,
+        "total_sugar": total_sugar,
+        "risk_level": classify_calories(total_calories),
+    }
+
+
+def error_payload(message: str, fmt: str) -> dict:
+    """Result of an image that could not be scored, shaped like a normal one."""
+    if fmt == ENVELOPE:
+        return {"detections": [], "error": message}
+    return {
+        "candy": [],
+        "class_id": [],
+        "confidence": [],
+        "bbox": [],
+        "counts": {},
+        "total_count": 0,
+        "total_calories": 0,
+        "total_sugar": 0,
+        "risk_level": classify_calories(0),
+        "error": message,
+    }
+
+
+def encode_payload(payload: dict, fmt: str) -> tuple:
+    if fmt == MSGPACK:
+        return MSGPACK_TYPES[0], msgpack.packb(payload)  # type:ignore
+    if fmt == LEAN:
+        body = json.dumps(payload, separators=(",", ":"))
+        return LEAN_JSON_TYPE, body.encode("utf-8")
+    response = {"content": [{"type": "text", "text": json.dumps(payload)}]}
+    return "application/json", json.dumps(response).encode("utf-8")
+
+
+def encode(arrays: dict, state, fmt: str) -> tuple:
+    """Returns (content_type, body) for a single image result."""
+    if fmt == ENVELOPE:
+        return encode_payload({"detections": to_detections(arrays, state)}, fmt)
+    return encode_payload(to_lean(arrays, state), fmt)
+
+
+def encode_error(message: str, fmt: str) -> tuple:
+    return encode_payload(error_payload(message, fmt), fmt)
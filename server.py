@@ -1,104 +1,436 @@
 import base64
+import binascii
+import io
 import json
+import os
+import tarfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email import policy
+from email.parser import BytesHeaderParser
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 
 import cv2
-import numpy as np
-from ultralytics import YOLO  # type:ignore
 
-MODEL_PATH = "my_model (1)/train3/weights/best.pt"
-model = YOLO(MODEL_PATH, task="detect")
+from hot_reload import ModelManager, ModelState
+from image_io import BufferPool, ImageTooLarge, decode_image, read_into
+from profiling import current_rss_mb
+from responses import (
+    ENVELOPE,
+    encode,
+    encode_error,
+    error_payload,
+    extract_arrays,
+    negotiate,
+    to_detections,
+    to_lean,
+)
 
-MIN_THRESH = 0.5
+manager = ModelManager()
+
+BATCH_SIZE = 8
+DECODE_WORKERS = 4
+IMG_EXT_LIST = [".jpg", ".jpeg", ".png", ".bmp"]
+TAR_TYPES = ("application/x-tar", "application/gzip", "application/x-gtar")
+
+MAX_REQUEST_BYTES = 20 * 1024 * 1024
+MAX_BATCH_BYTES = 64 * 1024 * 1024
+MAX_IMAGE_PIXELS = 40_000_000
+REDUCED_DECODE = True
+
+body_pool = BufferPool(4 * 1024 * 1024)
+
+
+def decode_upload(image_bytes, state: ModelState) -> tuple:
+    return decode_image(
+        image_bytes,
+        imgsz=state.imgsz,
+        max_pixels=MAX_IMAGE_PIXELS,
+        reduce=REDUCED_DECODE,
+    )
+
+
+def find_json_string(buf: bytearray, key: str, length: int) -> tuple | None:
+    # Locates a plain (escape-free) string value so a large base64 payload can be
+    # decoded straight out of the request buffer without building a str copy.
+    token = f'"{key}"'.encode("utf-8")
+    start = buf.find(token, 0, length)
+    if start < 0:
+        return None
+    colon = buf.find(b":", start + len(token), length)
+    quote = buf.find(b'"', colon + 1, length)
+    if colon < 0 or quote < 0 or buf[colon + 1 : quote].strip():
+        return None
+    end = buf.find(b'"', quote + 1, length)
+    if end < 0 or buf.find(b"\\", quote + 1, end) >= 0:
+        return None
+    return quote + 1, end
+
+
+def check_content_length(value: str | None) -> tuple:
+    """Returns (length, None), or (None, (status, message)) for a bad header."""
+    if value is None:
+        return None, (411, "Content-Length required")
+    try:
+        length = int(value)
+    except ValueError:
+        length = -1
+    if length < 0:
+        return None, (400, "Invalid Content-Length")
+    return length, None
+
+
+class BoundedReader:
+    def __init__(self, fileobj, length: int):
+        self.fileobj = fileobj
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.fileobj.read(size)
+        self.remaining -= len(data)
+        return data
+
+
+def is_image_name(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in IMG_EXT_LIST
+
+
+# The open_* helpers parse enough of the body to reject malformed input up
+# front, then return a generator of (name, image bytes). A member over
+# MAX_REQUEST_BYTES is yielded as an ImageTooLarge in place of its bytes
+# without being read into memory.
+
+
+def member_too_large(name: str, size: int) -> ImageTooLarge | None:
+    if size > MAX_REQUEST_BYTES:
+        return ImageTooLarge(f"{name} is over the {MAX_REQUEST_BYTES} byte limit")
+    return None
+
+
+def open_multipart(fileobj, content_type: str, chunk_size: int = 64 * 1024):
+    header = f"Content-Type: {content_type}\r\n\r\n".encode("utf-8")
+    message = BytesHeaderParser(policy=policy.default).parsebytes(header)
+    boundary = message.get_boundary()
+    if not boundary:
+        raise ValueError("Malformed multipart body: no boundary")
+    delimiter = b"--" + boundary.encode("latin-1")
+    separator = b"\r\n" + delimiter
+    buf = bytearray()
+
+    def fill() -> bool:
+        data = fileobj.read(chunk_size)
+        buf.extend(data)
+        return bool(data)
+
+    def skip_past(token: bytes) -> bool:
+        # Drops everything up to and including `token`; False if the body ends first.
+        while (i := buf.find(token)) < 0:
+            del buf[: max(len(buf) - len(token) + 1, 0)]
+            if not fill():
+                return False
+        del buf[: i + len(token)]
+        return True
+
+    def at_last_delimiter() -> bool:
+        while len(buf) < 2:
+            if not fill():
+                raise ValueError("Multipart body ended after a boundary")
+        return buf[:2] == b"--"
+
+    if not skip_past(delimiter):
+        raise ValueError("Malformed multipart body: boundary not found")
+
+    def parts():
+        while not at_last_delimiter():
+            while (end := buf.find(b"\r\n\r\n")) < 0:
+                if len(buf) > 16 * 1024 or not fill():
+                    raise ValueError("Malformed multipart part headers")
+            headers = BytesHeaderParser(policy=policy.default).parsebytes(
+                bytes(buf[: end + 4]).lstrip(b"\r\n")
+            )
+            del buf[: end + 4]
+            name = headers.get_filename() or headers.get_param(
+                "name", header="content-disposition"
+            )
+
+            data = bytearray()
+            error = None
+            while (i := buf.find(separator)) < 0:
+                keep = len(separator) - 1
+                if error is None:
+                    data.extend(buf[: max(len(buf) - keep, 0)])
+                    error = member_too_large(name, len(data))
+                    if error is not None:
+                        data = bytearray()
+                del buf[: max(len(buf) - keep, 0)]
+                if not fill():
+                    raise ValueError("Multipart body ended inside a part")
+            if error is None:
+                data.extend(buf[:i])
+                error = member_too_large(name, len(data))
+            del buf[: i + len(separator)]
+            yield name, error or data
+
+    return parts()
+
+
+def open_zip(body: bytes):
+    archive = zipfile.ZipFile(io.BytesIO(body))
+
+    def members():
+        with archive:
+            for info in archive.infolist():
+                if info.is_dir() or not is_image_name(info.filename):
+                    continue
+                error = member_too_large(info.filename, info.file_size)
+                yield info.filename, error or archive.read(info)
+
+    return members()
+
+
+def open_tar(fileobj):
+    archive = tarfile.open(fileobj=fileobj, mode="r|*")
+
+    def members():
+        with archive:
+            for member in archive:
+                if not member.isfile() or not is_image_name(member.name):
+                    continue
+                # Stream mode skips the data of members that are never extracted.
+                error = member_too_large(member.name, member.size)
+                if error is not None:
+                    yield member.name, error
+                    continue
+                yield member.name, archive.extractfile(member).read()  # type:ignore
+
+    return members()
+
+
+def decode_parallel(
+    items, pool: ThreadPoolExecutor, max_pending: int, state: ModelState
+):
+    def decode_item(index, name, image_bytes):
+        if isinstance(image_bytes, ImageTooLarge):
+            return index, name, None, 1.0, str(image_bytes)
+        try:
+            frame, scale = decode_upload(image_bytes, state)
+            return index, name, frame, scale, None
+        except (ValueError, cv2.error) as e:
+            return index, name, None, 1.0, str(e)
+
+    pending = set()
+    for index, (name, image_bytes) in enumerate(items):
+        pending.add(pool.submit(decode_item, index, name, image_bytes))
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
 
 
 class CORSRequestHandler(SimpleHTTPRequestHandler):
-    def _set_headers(self):
+    def _set_headers(self, content_type: str = "application/json"):
         self.send_response(200)
-        self.send_header("Content-type", "application/json")
+        self.send_header("Content-type", content_type)
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type, Accept")
+        self.send_header("Vary", "Accept")
         self.end_headers()
 
     def do_OPTIONS(self):
         self._set_headers()
 
+    def do_GET(self):
+        if self.path.rstrip("/") == "/api/config":
+            config = manager.current.config
+            self._set_headers()
+            response = {
+                "min_thresh": config["min_thresh"],
+                "class_thresh": config["class_thresh"],
+                "nutrition": config["nutrition"],
+            }
+            self.wfile.write(json.dumps(response).encode("utf-8"))
+        else:
+            super().do_GET()
+
     def do_POST(self):
         if self.path.rstrip("/") == "/api/send":
+            rss_before = current_rss_mb()
+            content_length, error = check_content_length(self.headers["Content-Length"])
+            if error is not None:
+                self._send_error(*error)
+                return
             try:
-                content_length = int(self.headers["Content-Length"])
-                post_data = self.rfile.read(content_length)
-                data = json.loads(post_data)
-
-                image_data = data.get("image_data")
-                image_bytes = base64.b64decode(image_data)
-
-                nparr = np.frombuffer(image_bytes, np.uint8)
-                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-                results = model(frame, verbose=False)  # type:ignore
-
-                detections = []
-                for box in results[0].boxes:
-                    xmin, ymin, xmax, ymax = (
-                        box.xyxy[0].cpu().numpy().astype(int).tolist()
+                if content_length > MAX_REQUEST_BYTES:
+                    self._discard_body(content_length)
+                    raise ImageTooLarge(
+                        f"Request is {content_length} bytes, limit is {MAX_REQUEST_BYTES}"
                     )
-                    classidx = int(box.cls.item())
-                    classname = model.names[classidx]
-                    conf = box.conf[0].item()
 
-                    print(
-                        f"Detection: {classname} @ {conf:.3f} | bbox: [{xmin}, {ymin}, {xmax}, {ymax}]"
-                    )
+                buf = body_pool.acquire(content_length)
+                try:
+                    body = read_into(self.rfile, buf, content_length)
+                    span = find_json_string(buf, "image_data", content_length)
+                    if span is not None:
+                        image_bytes = binascii.a2b_base64(body[span[0] : span[1]])
+                    else:
+                        data = json.loads(bytes(body))
+                        image_bytes = base64.b64decode(data.get("image_data"))
+                    del body
+                finally:
+                    body_pool.release(buf)
 
-                    if conf > MIN_THRESH:
-                        detections.append(
-                            {
-                                "candy": classname,
-                                "confidence": round(conf, 3),
-                                "bbox": [xmin, ymin, xmax, ymax],
-                            }
-                        )
+                state = manager.current
+                frame, scale = decode_upload(image_bytes, state)
+                del image_bytes
+
+                results = state.predict(frame)
+                arrays = extract_arrays(results[0], state, scale=scale, verbose=True)
+                count = len(arrays["class_id"])
 
+                print(f"Detected {count} candies above threshold {state.min_thresh}")
+                rss = current_rss_mb()
                 print(
-                    f"Detected {len(detections)} candies above threshold {MIN_THRESH}"
+                    f"Decoded {frame.shape[1]}x{frame.shape[0]} (scale {scale:g}), "
+                    f"RSS {rss:.1f} MB ({rss - rss_before:+.1f} MB this request)"
                 )
                 print("-" * 50)
 
-                self._set_headers()
-                response = {
-                    "content": [
-                        {"type": "text", "text": json.dumps({"detections": detections})}
-                    ]
-                }
-                self.wfile.write(json.dumps(response).encode("utf-8"))
+                fmt = negotiate(self.headers.get("Accept"))
+                content_type, response = encode(arrays, state, fmt)
+                self._set_headers(content_type)
+                self.wfile.write(response)
+
+            except ImageTooLarge as e:
+                print(f"Rejected: {e}")
+                self._send_error(413, str(e))
 
             except Exception as e:
                 print(f"Error: {e}")
                 import traceback
 
                 traceback.print_exc()
-                self.send_response(500)
-                self.end_headers()
-                error_response = {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": json.dumps({"detections": [], "error": str(e)}),
-                        }
-                    ]
-                }
-                self.wfile.write(json.dumps(error_response).encode("utf-8"))
+                self._send_error(500, str(e))
+        elif self.path.rstrip("/") == "/api/batch":
+            self._handle_batch()
         else:
             self.send_error(404, "Endpoint not found")
 
+    def _discard_body(self, length: int, chunk_size: int = 64 * 1024):
+        # Reading the rejected body lets the client finish sending and see the
+        # error response instead of a connection reset.
+        body = BoundedReader(self.rfile, length)
+        while body.read(chunk_size):
+            pass
+
+    def _send_error(self, status: int, message: str):
+        # Errors use the format the client negotiated, so they parse the same
+        # way as a successful response.
+        fmt = negotiate(self.headers.get("Accept"))
+        content_type, body = encode_error(message, fmt)
+        self.send_response(status)
+        self.send_header("Content-type", content_type)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Vary", "Accept")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_line(self, payload: dict):
+        self.wfile.write(json.dumps(payload).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+    def _infer_batch(self, batch: list, state: ModelState, fmt: str):
+        frames = [frame for _, _, frame, _ in batch]
+        results = state.predict(frames)
+        for (index, name, _, scale), result in zip(batch, results):
+            arrays = extract_arrays(result, state, scale=scale)
+            if fmt == ENVELOPE:
+                line = {"detections": to_detections(arrays, state)}
+            else:
+                line = to_lean(arrays, state)
+            self._write_line({"index": index, "name": name, **line})
+        print(f"Batch: scored {len(batch)} images, RSS {current_rss_mb():.1f} MB")
+
+    def _handle_batch(self):
+        content_length, error = check_content_length(self.headers["Content-Length"])
+        if error is not None:
+            self.send_error(*error)
+            return
+        content_type = self.headers.get("Content-Type", "")
+        # Zip needs random access, so only zip bodies are buffered; multipart and
+        # tar are streamed part by part.
+        is_zip = content_type in ("application/zip", "application/x-zip-compressed")
+        if is_zip and content_length > MAX_BATCH_BYTES:
+            self._discard_body(content_length)
+            self.send_error(413, f"Batch body limit is {MAX_BATCH_BYTES} bytes")
+            return
+        body = BoundedReader(self.rfile, content_length)
+
+        try:
+            if content_type.startswith("multipart/form-data"):
+                items = open_multipart(body, content_type)
+            elif is_zip:
+                items = open_zip(body.read())
+            elif content_type in TAR_TYPES:
+                items = open_tar(body)
+            else:
+                self._discard_body(content_length)
+                self.send_error(415, "Expected multipart/form-data, zip or tar body")
+                return
+        except (ValueError, zipfile.BadZipFile, tarfile.TarError) as e:
+            self.send_error(400, f"Malformed batch body: {e}")
+            return
+
+        state = manager.current
+        fmt = negotiate(self.headers.get("Accept"))
+
+        # Results are written as newline-delimited JSON in completion order;
+        # "index" is the position of the image in the request.
+        self._set_headers("application/x-ndjson")
+        try:
+            with ThreadPoolExecutor(DECODE_WORKERS) as pool:
+                batch = []
+                for index, name, frame, scale, error in decode_parallel(
+                    items, pool, BATCH_SIZE * 2, state
+                ):
+                    if frame is None:
+                        self._write_line(
+                            {"index": index, "name": name, **error_payload(error, fmt)}
+                        )
+                        continue
+                    batch.append((index, name, frame, scale))
+                    if len(batch) >= BATCH_SIZE:
+                        self._infer_batch(batch, state, fmt)
+                        batch = []
+                if batch:
+                    self._infer_batch(batch, state, fmt)
+        except Exception as e:
+            print(f"Error: {e}")
+            import traceback
+
+            traceback.print_exc()
+            self._write_line({"error": str(e)})
+
 
 if __name__ == "__main__":
     print("Server running on port 8000...")
-    print(f"Loading YOLO model from: {MODEL_PATH}")
-    print(f"Model classes: {model.names}")
-    print(f"Confidence threshold: {MIN_THRESH}")
+    state = manager.current
+    print(f"Loaded YOLO model from: {state.model_path}")
+    print(f"Model classes: {state.names}")
+    print(f"Confidence threshold: {state.min_thresh}")
+    if state.config["class_thresh"]:
+        print(f"Per-class thresholds: {state.config['class_thresh']}")
+    print(f"Max detections per image: {state.max_det}")
+    print(f"Watching {manager.config_path} for changes")
+    manager.start()
 
     httpd = HTTPServer(("localhost", 8000), CORSRequestHandler)
     try:
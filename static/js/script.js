@@ -1,9 +1,5 @@
-const NUTRITION_INFO = {
-    "Bar_One": [201, 21],
-    "Gems": [50, 9],
-    "Kit-Kat": [106, 11],
-    "Milky_Bar": [137, 14]
-};
+// Filled from the server's config.json by loadConfig().
+let NUTRITION_INFO = {};
 
 const COLORS = {
     green: '#00FF00',
@@ -26,6 +22,8 @@ const BBOX_COLORS = [
     'rgb(172, 176, 184)'
 ];
 
+const LEAN_JSON_TYPE = 'application/vnd.candy.lean+json';
+
 let currentImage = null;
 let stream = null;
 let liveStream = null;
@@ -48,6 +46,21 @@ const liveCanvas = document.getElementById('liveCanvas');
 const resultCanvas = document.getElementById('resultCanvas');
 const liveResultCanvas = document.getElementById('liveResultCanvas');
 
+async function loadConfig() {
+    try {
+        const response = await fetch('http://localhost:8000/api/config');
+        const config = await response.json();
+        NUTRITION_INFO = {};
+        Object.entries(config.nutrition).forEach(([candy, values]) => {
+            NUTRITION_INFO[candy.replace(/[- ]/g, '_')] = values;
+        });
+    } catch (err) {
+        console.error('Error loading config:', err);
+        showError('Failed to load nutrition data. Make sure your Python server is running on port 8000.');
+    }
+}
+
+const configReady = loadConfig();
 
 uploadArea.addEventListener('click', () => fileInput.click());
 
@@ -205,6 +218,7 @@ async function analyzeLiveFrame() {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
+                        'Accept': LEAN_JSON_TYPE,
                     },
                     body: JSON.stringify({
                         image_data: base64Data,
@@ -214,10 +228,14 @@ async function analyzeLiveFrame() {
                 });
 
                 const data = await response.json();
-                const text = data.content.find(c => c.type === 'text')?.text || '{}';
-                const cleanText = text.replace(/```json|```/g, '').trim();
-                const detectionData = JSON.parse(cleanText);
+                if (!response.ok || !data.candy) {
+                    console.error('Live analysis error:', data.error || response.status);
+                    clearLiveBoundingBoxes();
+                    return;
+                }
+                const detectionData = leanToDetections(data);
 
+                await configReady;
                 processResults(detectionData, 1);
 
 
@@ -234,6 +252,16 @@ async function analyzeLiveFrame() {
     }, 'image/jpeg', 0.8);
 }
 
+// Lean responses carry parallel arrays with bbox flattened to four values per box.
+function leanToDetections(data) {
+    const detections = data.candy.map((candy, i) => ({
+        candy,
+        confidence: data.confidence[i],
+        bbox: data.bbox.slice(i * 4, i * 4 + 4)
+    }));
+    return { detections };
+}
+
 function captureImage() {
     const canvas = document.getElementById('canvas');
     canvas.width = video.videoWidth;
@@ -278,6 +306,7 @@ async function analyzeImage() {
             const cleanText = text.replace(/```json|```/g, '').trim();
             const detectionData = JSON.parse(cleanText);
 
+            await configReady;
             processResults(detectionData);
 
 
@@ -298,7 +327,7 @@ async function analyzeImage() {
 function processResults(detectionData, liveframe = 0) {
     const candyCounts = {};
     detectionData.detections.forEach(d => {
-        const lookupKey = d.candy.replace(/ /g, '_');
+        const lookupKey = d.candy.replace(/[- ]/g, '_');
         candyCounts[lookupKey] = (candyCounts[lookupKey] || 0) + 1;
     });
 
@@ -347,7 +376,7 @@ function displayResults(results) {
     const candyList = document.getElementById('candyList');
     candyList.innerHTML = '';
     Object.entries(results.candyCounts).forEach(([candy, count]) => {
-        const lookupKey = candy.replace(/ /g, '_');
+        const lookupKey = candy.replace(/[- ]/g, '_');
         const nutrition = NUTRITION_INFO[lookupKey];
 
         if (!nutrition) return;
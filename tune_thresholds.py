@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from config import CONFIG_PATH, load_config
+from evaluate import (
+    collect_predictions,
+    load_model,
+    match_predictions,
+    parse_run,
+    resolve_images,
+)
+
+CONF_GRID = np.linspace(0.05, 0.95, 91)
+
+
+def f1_curves(records: list, classes: list) -> dict:
+    """Precision, recall and F1 at IoU 0.5 for every confidence in CONF_GRID."""
+    per_class = {c: {"tp": [], "conf": [], "n_gt": 0} for c in classes}
+    for pred_cls, conf, pred_boxes, gt_cls, gt_boxes in records:
+        tp = match_predictions(pred_cls, pred_boxes, gt_cls, gt_boxes)[:, 0]
+        for c in classes:
+            is_class = pred_cls == c
+            per_class[c]["tp"].append(tp[is_class])
+            per_class[c]["conf"].append(conf[is_class])
+            per_class[c]["n_gt"] += int((gt_cls == c).sum())
+
+    curves = {}
+    for c, data in per_class.items():
+        tp = np.concatenate(data["tp"])
+        conf = np.concatenate(data["conf"])
+        above = conf[None, :] > CONF_GRID[:, None]
+        hits = (above & tp[None, :]).sum(axis=1)
+        predicted = above.sum(axis=1)
+        precision = np.divide(
+            hits, predicted, out=np.zeros(len(CONF_GRID)), where=predicted > 0
+        )
+        recall = hits / data["n_gt"] if data["n_gt"] else np.zeros(len(CONF_GRID))
+        f1 = np.divide(
+            2 * precision * recall,
+            precision + recall,
+            out=np.zeros(len(CONF_GRID)),
+            where=(precision + recall) > 0,
+        )
+        curves[c] = {
+            "precision": precision,
+            "recall": recall,
+            "f1": f1,
+            "n_gt": data["n_gt"],
+        }
+    return curves
+
+
+def pick_threshold(curve: dict, tolerance: float) -> int:
+    # Highest confidence within `tolerance` of the best F1: same accuracy, fewer
+    # boxes to post-process.
+    f1 = curve["f1"]
+    return int(np.nonzero(f1 >= f1.max() - tolerance)[0][-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pick per-class confidence thresholds from validation F1 curves."
+    )
+    parser.add_argument(
+        "--data",
+        help='Labeled validation set: a YOLO data.yaml, or a folder with images/ and labels/ (example: "datasets/candy/valid")',
+        required=True,
+    )
+    parser.add_argument(
+        "--model",
+        help="Path to YOLO model file, defaults to model_path in config.json",
+        default=None,
+    )
+    parser.add_argument(
+        "--tolerance",
+        help='Accept thresholds whose F1 is within this of the best, preferring higher ones (example: "0.005")',
+        type=float,
+        default=0.005,
+    )
+    parser.add_argument(
+        "--write",
+        help="Save the thresholds as class_thresh in config.json",
+        action="store_true",
+    )
+    args = parser.parse_args()
+
+    config = load_config()
+    run = parse_run(f"model={args.model}" if args.model else "", config)
+    images, names = resolve_images(args.data)
+    if not images:
+        print(f"ERROR: No images found for {args.data}.")
+        sys.exit(1)
+
+    model = load_model(run)
+    names = names or model.names
+    print(f"Collecting predictions on {len(images)} images...")
+    records, _ = collect_predictions(model, images, run)
+    curves = f1_curves(records, sorted(names))
+
+    class_thresh = {}
+    print(f"{'class':<12} {'n':>5} {'thresh':>7} {'P':>6} {'R':>6} {'F1':>6}")
+    for c, curve in curves.items():
+        if curve["n_gt"] == 0:
+            print(f"{names[c]:<12} {0:>5}  no labels, keeping default")
+            continue
+        i = pick_threshold(curve, args.tolerance)
+        class_thresh[names[c]] = round(float(CONF_GRID[i]), 3)
+        print(
+            f"{names[c]:<12} {curve['n_gt']:>5} {CONF_GRID[i]:>7.2f} "
+            f"{curve['precision'][i]:6.3f} {curve['recall'][i]:6.3f} {curve['f1'][i]:6.3f}"
+        )
+
+    if args.write:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        raw["class_thresh"] = class_thresh
+        # The server polls config.json, so swap in a complete file rather than
+        # letting it read a half-written one.
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(CONFIG_PATH)), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(raw, f, indent=4)
+                f.write("\n")
+            os.chmod(tmp_path, os.stat(CONFIG_PATH).st_mode & 0o777)
+            os.replace(tmp_path, CONFIG_PATH)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        print(f"Wrote class_thresh to {CONFIG_PATH}")
+    else:
+        print(json.dumps({"class_thresh": class_thresh}, indent=4))
+
+
+if __name__ == "__main__":
+    main()